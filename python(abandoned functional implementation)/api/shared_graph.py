@@ -1,3 +1,5 @@
 from graph.graph import BeliefGraph
+from graph.layout import LayoutCache
 
-shared_graph = BeliefGraph()
\ No newline at end of file
+shared_graph = BeliefGraph()
+shared_layout = LayoutCache(shared_graph)
\ No newline at end of file
@@ -1,15 +1,145 @@
 from graph.graph import BeliefGraph
 from graph.node import BeliefNode
-from typing import Optional, Dict, Any
+import json
+from typing import Optional, Dict, Any, List
 from api.shared_graph import  shared_graph as graph
 
 tool_registry: Dict[str, Any] = {}
 tool_schemas: Dict[str, Dict[str, Any]] = {}
+tool_validators: Dict[str, Any] = {}
+
+
+class ToolArgumentError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+# ──────────────────────  ARGUMENT VALIDATION  ──────────────────────
+# Each tool's JSON Schema is compiled once, at registration, into a closure
+# that checks and coerces the decoded arguments. The coercions cover the
+# mistakes models commonly make: numbers sent as strings, "true"/"false"
+# strings, ids sent as numbers and 0-1 confidences sent as whole percentages.
+# Anything still out of range is rejected so the model can correct it.
+
+def _compile_property(prop_name: str, spec: dict):
+    prop_type = spec.get("type")
+    minimum   = spec.get("minimum")
+    maximum   = spec.get("maximum")
+
+    if prop_type == "number":
+        unit_interval = minimum == 0 and maximum == 1
+
+        def check(value):
+            scale = 1.0
+            if isinstance(value, str):
+                text  = value.strip()
+                scale = 100.0 if text.endswith("%") else 1.0
+                try:
+                    value = float(text.rstrip("%")) / scale
+                except ValueError:
+                    raise ValueError(f"'{prop_name}' must be a number, got {value!r}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{prop_name}' must be a number, got {value!r}")
+            value = float(value)
+            if value != value:
+                raise ValueError(f"'{prop_name}' must be a number, got NaN")
+            # Models often send a 0-1 score as a whole percentage (85 for
+            # 0.85). Fractions like 1.5 are ambiguous and are rejected below.
+            if unit_interval and scale == 1.0 and value.is_integer() and 1.0 < value <= 100.0:
+                value /= 100.0
+            if minimum is not None and value < minimum:
+                raise ValueError(f"'{prop_name}' must be >= {minimum}, got {value!r}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"'{prop_name}' must be <= {maximum}, got {value!r}")
+            return value
+    elif prop_type == "string":
+        def check(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            if not isinstance(value, str):
+                raise ValueError(f"'{prop_name}' must be a string, got {value!r}")
+            return value
+    elif prop_type == "boolean":
+        def check(value):
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+            if not isinstance(value, bool):
+                raise ValueError(f"'{prop_name}' must be a boolean, got {value!r}")
+            return value
+    elif prop_type == "integer":
+        def check(value):
+            if isinstance(value, str):
+                try:
+                    value = int(value.strip())
+                except ValueError:
+                    raise ValueError(f"'{prop_name}' must be an integer, got {value!r}")
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"'{prop_name}' must be an integer, got {value!r}")
+            if minimum is not None and value < minimum:
+                raise ValueError(f"'{prop_name}' must be >= {minimum}, got {value!r}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"'{prop_name}' must be <= {maximum}, got {value!r}")
+            return value
+    else:
+        def check(value):
+            return value
+
+    allowed = spec.get("enum")
+    if allowed is not None:
+        typed_check = check
+
+        def check(value):
+            value = typed_check(value)
+            if value not in allowed:
+                raise ValueError(f"'{prop_name}' must be one of {allowed}, got {value!r}")
+            return value
+
+    return check
+
+
+def compile_schema(parameters: dict):
+    checks   = {k: _compile_property(k, spec) for k, spec in parameters.get("properties", {}).items()}
+    required = tuple(parameters.get("required", []))
+    extras   = parameters.get("additionalProperties", False)
+
+    def validate(args: Any) -> Dict[str, Any]:
+        if not isinstance(args, dict):
+            raise ToolArgumentError([f"Arguments must be an object, got {type(args).__name__}"])
+
+        errors = []
+        clean  = {}
+        for key, value in args.items():
+            check = checks.get(key)
+            if check is None:
+                if extras:
+                    clean[key] = value
+                else:
+                    errors.append(f"Unexpected argument '{key}'")
+                continue
+            if value is None:
+                # Optional: treated as absent. Required: reported once, below.
+                continue
+            try:
+                clean[key] = check(value)
+            except ValueError as e:
+                errors.append(str(e))
+
+        for key in required:
+            if key not in args or args[key] is None:
+                errors.append(f"Missing required argument '{key}'")
+
+        if errors:
+            raise ToolArgumentError(errors)
+        return clean
+
+    return validate
 
 
 def register_tool(*, name: str, description: str, parameters: dict):
     def decorator(func):
         tool_registry[name] = func
+        tool_validators[name] = compile_schema(parameters)
         tool_schemas[name] = {
             "name": name,
             "description": description,
@@ -18,6 +148,31 @@ def register_tool(*, name: str, description: str, parameters: dict):
         return func
     return decorator
 
+
+def call_tool(name: str, raw_args: Any) -> Dict[str, Any]:
+    """
+    Decode, validate and dispatch a tool call. Never raises: failures come
+    back as {"status": "error", ...} so they can be reported to the model.
+    """
+    if name not in tool_registry:
+        return {"status": "error", "message": f"Unknown tool '{name}'"}
+
+    if isinstance(raw_args, (str, bytes)):
+        try:
+            raw_args = json.loads(raw_args) if raw_args else {}
+        except json.JSONDecodeError as e:
+            return {"status": "error", "message": f"Arguments are not valid JSON: {e}"}
+
+    try:
+        args = tool_validators[name](raw_args)
+    except ToolArgumentError as e:
+        return {"status": "error", "message": "Invalid arguments", "errors": e.errors}
+
+    try:
+        return {"status": "ok", "args": args, "result": tool_registry[name](**args)}
+    except Exception as e:
+        return {"status": "error", "args": args, "message": f"{type(e).__name__}: {e}"}
+
 @register_tool(
     name="addNode",
     description="Create a belief node and return its id.",
@@ -183,18 +338,35 @@ def get_node(node_id: str):
 
 @register_tool(
     name="getNeighbors",
-    description="Get neighbors of a node.",
+    description=(
+        "Get neighbors of a node, optionally filtered by edge label, direction "
+        "and minimum edge confidence. Results are paged: pass the returned "
+        "next_cursor back as cursor to fetch more."
+    ),
     parameters={
         "type": "object",
         "properties": {
             "node_id": {"type": "string"},
-            "as_objects": {"type": "boolean", "default": True},
+            "label": {"type": "string"},
+            "direction": {"type": "string", "enum": ["in", "out", "both"], "default": "both"},
+            "min_confidence": {"type": "number", "minimum": 0, "maximum": 1},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 200, "default": 50},
+            "cursor": {"type": "string"},
         },
         "required": ["node_id"],
     },
 )
-def get_neighbors(node_id: str, as_objects: bool = True):
-    return graph.get_neighbors(node_id, as_objects)
+def get_neighbors(
+    node_id: str,
+    label: Optional[str] = None,
+    direction: str = "both",
+    min_confidence: Optional[float] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    return graph.get_neighbor_page(
+        node_id, False, label, direction, min_confidence, limit, cursor
+    )
 
 @register_tool(
     name="getNodeHistory",
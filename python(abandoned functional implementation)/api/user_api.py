@@ -1,4 +1,5 @@
-from api.shared_graph import  shared_graph as graph
+import json
+from api.shared_graph import  shared_graph as graph, shared_layout as layout
 from typing import Dict, Any, Tuple
 
 def save_graph(path: str = "belief_graph.json") -> Dict[str, Any]:
@@ -18,6 +19,24 @@ def load_graph(path: str = "belief_graph.json") -> Dict[str, Any]:
 def export_graph_json() -> str:
     return graph.to_json()
 
+def export_graph_with_layout() -> str:
+    """
+    Graph export with server-computed positions, ready for a preset layout:
+    each node carries "position": {"x", "y"}, and "clusters" holds the
+    level-of-detail summaries.
+    """
+    # One read lock around both, so a node written in between cannot be
+    # exported without a position.
+    with graph._lock.read():
+        computed = layout.get()
+        data = graph.to_dict()
+    positions = computed["positions"]
+    for node in data["nodes"]:
+        node["position"] = positions.get(node["id"])
+    data["clusters"] = computed["clusters"]
+    data["layout_version"] = computed["version"]
+    return json.dumps(data)
+
 def get_graph_diff(graph_a: Dict[str, Any], graph_b: Dict[str, Any]) -> Dict[str, Any]:
     def node_map(nodes: list) -> Dict[str, Dict]:
         return {node["id"]: node for node in nodes}
@@ -85,3 +104,12 @@ def has_node(node_id: str) -> bool:
 
 def has_edge(from_node: str, to_node: str, label: str) -> bool:
     return graph.has_edge(from_node, to_node, label)
+
+def rank_beliefs(workers: int = 1, limit: int = 20) -> list:
+    from graph import shards
+    ranked = shards.rank_support(graph.partition(max(workers, 1)), workers)
+    return [{"id": node_id, "score": score} for node_id, score in ranked[:limit]]
+
+def find_duplicate_beliefs(workers: int = 1) -> list:
+    from graph import shards
+    return shards.find_duplicates(graph.partition(max(workers, 1)), workers)
@@ -1,16 +1,130 @@
-import networkx as nx
 import json
-from typing import List, Dict, Optional
+import threading
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from itertools import count
+from typing import List, Dict, Optional, Tuple
 from graph.node import BeliefNode
+from graph.lock import RWLock, reads, writes
+
+# networkx is imported on first use rather than at module load: it dominates
+# the import time of the whole CLI and most short invocations never touch it.
+
+def _from_node_link(data: Dict):
+    import networkx as nx
+    # node_link_data moves each node's "id" attribute into the node key, so
+    # put it back; BeliefNode.from_dict requires it.
+    graph = nx.readwrite.json_graph.node_link_graph(data, edges="links" if "links" in data else "edges")
+    for node_id, attrs in graph.nodes(data=True):
+        attrs["id"] = node_id
+    return graph
+
+class _Bucket:
+    '''
+    Insertion-ordered set of node ids where every entry carries a sequence
+    number from a graph-wide counter. Sequence numbers only grow, so a
+    neighbour cursor can resume right after the last id it returned with a
+    bisect, and ids added later never shift what came before them.
+    '''
+
+    def __init__(self):
+        self.seq: Dict[str, int] = {}
+        self.entries: List[Tuple[int, str]] = []
+
+    def add(self, item: str, seq: int) -> None:
+        if item not in self.seq:
+            self.seq[item] = seq
+            self.entries.append((seq, item))
+
+    def pop(self, item: str, default=None):
+        if self.seq.pop(item, None) is None:
+            return default
+        # Removed ids stay in entries as tombstones until they outnumber live ones.
+        if len(self.entries) > 2 * len(self.seq) + 8:
+            self.entries = [(n, i) for n, i in self.entries if self.seq.get(i) == n]
+        return None
+
+    def iter_from(self, after: int = -1):
+        start = bisect_left(self.entries, (after + 1,))
+        # Walk by index instead of slicing: callers stop once a page is full,
+        # so a resumed page should not copy the rest of the bucket first.
+        entries = self.entries
+        for i in range(start, len(entries)):
+            n, item = entries[i]
+            if self.seq.get(item) == n:
+                yield n, item
+
+    def __iter__(self):
+        return (item for _, item in self.iter_from())
+
+    def __len__(self):
+        return len(self.seq)
 
 class BeliefGraph:
+    # Every public method takes self._lock: readers share it, mutations hold it
+    # exclusively. Callers that touch self.graph directly must do the same.
     def __init__(self):
-        self.graph = nx.MultiDiGraph()
+        self._graph = None
+        self._graph_init = threading.Lock()
+        self._lock = RWLock()
+        self.version = 0
         self.node_counter = 0
 
-        self.node_history = []
-        self.edge_history = []
-
+        self.node_history = deque(maxlen=15)
+        self.edge_history = deque(maxlen=15)
+
+        # Secondary indexes, kept in step with self.graph by every edge mutation.
+        #   label_index[label]         -> {(source, target): None}
+        #   out_index[source][label]   -> _Bucket of targets
+        #   in_index[target][label]    -> _Bucket of sources
+        self.label_index: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self.out_index: Dict[str, Dict[str, _Bucket]] = {}
+        self.in_index: Dict[str, Dict[str, _Bucket]] = {}
+        self._edge_seq = count()
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            with self._graph_init:
+                if self._graph is None:
+                    import networkx as nx
+                    self._graph = nx.MultiDiGraph()
+        return self._graph
+
+    @graph.setter
+    def graph(self, value):
+        self._graph = value
+        self._rebuild_indexes()
+
+    def _index_edge(self, u: str, v: str, label: str) -> None:
+        self.label_index.setdefault(label, {})[(u, v)] = None
+        seq = next(self._edge_seq)
+        self.out_index.setdefault(u, {}).setdefault(label, _Bucket()).add(v, seq)
+        self.in_index.setdefault(v, {}).setdefault(label, _Bucket()).add(u, seq)
+
+    def _unindex_edge(self, u: str, v: str, label: str) -> None:
+        for index, key, item in (
+            (self.label_index, label, (u, v)),
+            (self.out_index.get(u, {}), label, v),
+            (self.in_index.get(v, {}), label, u),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(item, None)
+                if not bucket:
+                    del index[key]
+        if not self.out_index.get(u, True):
+            del self.out_index[u]
+        if not self.in_index.get(v, True):
+            del self.in_index[v]
+
+    def _rebuild_indexes(self) -> None:
+        self.label_index, self.out_index, self.in_index = {}, {}, {}
+        for u, v, k in self.graph.edges(keys=True):
+            self._index_edge(u, v, k)
+
+    @writes
     def add_node(self, node: BeliefNode):
         assert node, "Node cannot be empty."
         assert isinstance(node, BeliefNode), "Node must be an instance of BeliefNode."
@@ -22,12 +136,15 @@ class BeliefGraph:
         if self.graph.has_node(node.id):
             raise ValueError(f"Node with id {node.id} already exists.")
 
+        node.add_history("Node Created")
         self.graph.add_node(node.id, **node.to_dict())
+        self._touch(node_id)
 
         self.update_node_history(node_id, "Add Node", **node.to_dict())
         return node_id
 
 
+    @writes
     def update_node(self, node_id: str, **updates):
         '''
         **updates = {
@@ -43,15 +160,29 @@ class BeliefGraph:
         node_data = self.graph.nodes[node_id]
         belief_node = BeliefNode.from_dict(node_data)
 
+        changed = []
         for item, value in updates.items():
-            if hasattr(belief_node, item):
+            if hasattr(belief_node, item) and item != "history" and json.dumps(getattr(belief_node, item)) != json.dumps(value):
                 setattr(belief_node, item, value)
+                changed.append(item)
+        if changed:
+            belief_node.add_history("Update Node: " + ", ".join(changed))
 
         updated_data = {**node_data, **belief_node.to_dict()}
 
         self.graph.nodes[node_id].update(updated_data)
+        self._touch(node_id)
         self.update_node_history(node_id, "Update Node", **updated_data)
 
+    def _touch(self, *node_ids: str) -> None:
+        # Confidence decay (graph.maintenance) measures idle time from
+        # last_active. It is kept apart from history so edge traffic does not
+        # push the node's own entries out of its 10-entry log.
+        now = datetime.now().isoformat()
+        for node_id in node_ids:
+            self.graph.nodes[node_id]["last_active"] = now
+
+    @writes
     def update_node_history(self, node_id: str, action: str, **updates) -> None:
         assert node_id, "Node ID must be specified."
         if not self.graph.has_node(node_id):
@@ -59,19 +190,14 @@ class BeliefGraph:
         
         updates_str = f"node_id: {node_id}, Action: {action}, ".join(f"{k}: {v}" for k, v in updates.items())
 
-        if len(self.node_history) >= 15:
-            self.node_history.pop(0)
-
         self.node_history.append(updates_str)
 
+    @writes
     def update_edge_history(self, from_node_id: str, to_node_id: str, action: str, label = None, confidence = None, *args) -> None:
         assert from_node_id and to_node_id, "Both from_node and to_node must be specified."
         if not self.graph.has_edge(from_node_id, to_node_id):
             raise ValueError("Edge does not exist.")
 
-        if len(self.edge_history) >= 15:
-            self.edge_history.pop(0)
-
         edge_info = {
             "from": from_node_id,
             "to": to_node_id,
@@ -83,12 +209,15 @@ class BeliefGraph:
 
         self.edge_history.append(edge_info)
         
+    @reads
     def get_node_history(self) -> List:
-        return self.node_history
+        return list(self.node_history)
 
+    @reads
     def get_edge_history(self) -> List:
-        return self.edge_history
+        return list(self.edge_history)
 
+    @writes
     def add_edge(self, from_node_id: str, to_node_id: str, label: str, confidence: float = 1.0, **attrs):
         assert from_node_id and to_node_id, "Both from_node and to_node must be specified."
         assert label, "Edge label must be specified."
@@ -102,8 +231,11 @@ class BeliefGraph:
             raise ValueError(f"Edge from {from_node_id} to {to_node_id} with label '{label}' already exists.")
 
         self.graph.add_edge(from_node_id, to_node_id, key=label, confidence=confidence, **attrs)
+        self._index_edge(from_node_id, to_node_id, label)
+        self._touch(from_node_id, to_node_id)
         self.update_edge_history(from_node_id, to_node_id, "Update Edge Confidence", label=label, confidence=confidence, **attrs)
 
+    @writes
     def update_edge_confidence(self, from_node_id: str, to_node_id: str, label: str, new_confidence: float):
         assert from_node_id and to_node_id, "Both from_node and to_node must be specified."
         assert label, "Edge label must be specified."
@@ -117,8 +249,10 @@ class BeliefGraph:
             raise ValueError("Edge not found.")
 
         self.graph[from_node_id][to_node_id][label]["confidence"] = new_confidence
+        self._touch(from_node_id, to_node_id)
         self.update_edge_history(from_node_id, to_node_id, "Update Edge Confidence", label=label, confidence=new_confidence)
 
+    @writes
     def add_history(self, node_id: str, action: str):
         assert node_id, "Node ID must be specified."
         if not self.graph.has_node(node_id):
@@ -127,16 +261,20 @@ class BeliefGraph:
         node = self.graph.nodes[node_id]
         belief_node = BeliefNode.from_dict(node)
         belief_node.add_history(action)
-        self.graph.nodes[node_id] = belief_node.to_dict()
+        self.graph.nodes[node_id].update(belief_node.to_dict())
+        self._touch(node_id)
 
+    @reads
     def get_node(self, node_id: str) -> Optional[BeliefNode]:
         return BeliefNode.from_dict(self.graph.nodes[node_id])
 
+    @reads
     def get_nodes(self) -> List[Dict]:
         return [
             {"id": node_id, **data} for node_id, data in self.graph.nodes(data=True)
         ]
 
+    @reads
     def get_edges(self) -> List[Dict]:
         return [
             {
@@ -148,82 +286,204 @@ class BeliefGraph:
             for u, v, k, d in self.graph.edges(keys=True, data=True)
         ]
 
+    @reads
     def to_json(self) -> str:
+        import networkx as nx
         data = nx.readwrite.json_graph.node_link_data(self.graph, edges="links")
         return json.dumps(data)
 
+    @writes
     def from_json(self, json_str: str):
-        data = json.loads(json_str)
-        self.graph = nx.readwrite.json_graph.node_link_graph(data)
+        self.graph = _from_node_link(json.loads(json_str))
         
+    @reads
     def to_dict(self) -> Dict:
         return {
             "nodes": self.get_nodes(),
             "edges": self.get_edges()
         }
 
+    @reads
     def save_to_file(self, file_path: str):
+        import networkx as nx
         state = {
-            "graph": nx.readwrite.json_graph.node_link_data(self.graph),
+            "graph": nx.readwrite.json_graph.node_link_data(self.graph, edges="links"),
             "node_counter": self.node_counter
         }
         with open(file_path, 'w') as f:
             f.write(json.dumps(state))
 
 
-    def validate_graph(self):
-        for node_id, data in self.graph.nodes(data=True):
-            try:
-                BeliefNode.from_dict(data)
-            except Exception as e:
-                raise ValueError(f"Node {node_id} failed validation: {e}")
-            
-        for u, v, k, d in self.graph.edges(keys=True, data=True):
-            if not isinstance(k, str):
-                raise ValueError(f"Edge label (key) must be a string between {u} and {v}")
+    @reads
+    def partition(self, num_shards: int, by: str = "hash"):
+        '''
+        Snapshot the graph into num_shards shards, by "hash" of node id or by
+        "community". See graph.shards for the jobs that run over the result.
+        '''
+        from graph.shards import GraphShards
+        return GraphShards.from_graph(self, num_shards, by)
+
+    def validate_graph(self, workers: int = 0):
+        if workers > 1:
+            # Only the partition snapshot holds the read lock; the fan-out
+            # runs without it so writers are not blocked for the pool's life.
+            from graph import shards
+            errors = shards.validate(self.partition(workers), workers)
+            if errors:
+                raise ValueError(errors[0])
+            return
+
+        with self._lock.read():
+            for node_id, data in self.graph.nodes(data=True):
+                try:
+                    BeliefNode.from_dict(data)
+                except Exception as e:
+                    raise ValueError(f"Node {node_id} failed validation: {e}")
+
+            for u, v, k, d in self.graph.edges(keys=True, data=True):
+                if not isinstance(k, str):
+                    raise ValueError(f"Edge label (key) must be a string between {u} and {v}")
         
 
+    @writes
     def load_from_file(self, file_path: str):
         with open(file_path, 'r') as f:
             state = json.load(f)
-            self.graph = nx.readwrite.json_graph.node_link_graph(state["graph"])
+            self.graph = _from_node_link(state["graph"])
             self.node_counter = state.get("node_counter", 0)
         self.validate_graph()
 
-    def get_neighbors(self, node_id: str, as_objects: bool = True) -> List[BeliefNode]:
+    def _iter_neighbor_edges(self, node_id: str, label: Optional[str], direction: str, min_confidence: Optional[float], cursor: Optional[str]):
+        '''
+        Yield (direction, label, seq, neighbour_id) in a stable order: out
+        edges before in edges, labels sorted, then insertion order within a
+        label. A cursor "direction:seq:label" resumes just after that edge.
+        '''
+        directions = ["out", "in"] if direction == "both" else [direction]
+        start_direction, start_seq, start_label = directions[0], -1, None
+        if cursor:
+            try:
+                start_direction, seq, start_label = cursor.split(":", 2)
+                start_seq = int(seq)
+            except ValueError:
+                raise ValueError(f"Invalid cursor {cursor!r}.")
+            if start_direction not in directions:
+                raise ValueError(f"Invalid cursor {cursor!r}.")
+            directions = directions[directions.index(start_direction):]
+
+        for edge_direction in directions:
+            index = (self.out_index if edge_direction == "out" else self.in_index).get(node_id, {})
+            labels = [label] if label is not None else sorted(index)
+            resuming = edge_direction == start_direction and start_label is not None
+            if resuming:
+                labels = [l for l in labels if l >= start_label]
+
+            for edge_label in labels:
+                bucket = index.get(edge_label)
+                if bucket is None:
+                    continue
+                after = start_seq if resuming and edge_label == start_label else -1
+                for seq, other in bucket.iter_from(after):
+                    if min_confidence is not None:
+                        u, v = (node_id, other) if edge_direction == "out" else (other, node_id)
+                        if self.graph[u][v][edge_label].get("confidence", 0.0) < min_confidence:
+                            continue
+                    yield edge_direction, edge_label, seq, other
+
+    @reads
+    def get_neighbor_page(
+        self,
+        node_id: str,
+        as_objects: bool = True,
+        label: Optional[str] = None,
+        direction: str = "both",
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        '''
+        Neighbours of node_id filtered by edge label, direction ("in", "out" or
+        "both") and minimum edge confidence. Results are served from the
+        adjacency indexes, so a labelled query only walks edges with that label
+        and a cursor resumes without re-reading earlier pages.
+        Returns {"neighbors": [...], "next_cursor": str | None}; pass
+        next_cursor back as cursor to fetch the following page. Neighbours are
+        de-duplicated within a page; one linked by several edges may show up
+        again on a later page.
+        '''
         assert node_id, "Node ID must be specified."
+        assert direction in ("in", "out", "both"), "Direction must be 'in', 'out' or 'both'."
+        assert limit is None or limit > 0, "Limit must be positive."
         if not self.graph.has_node(node_id):
             raise ValueError(f"Node {node_id} does not exist.")
 
-        neighbor_ids = set(self.graph.predecessors(node_id)).union(self.graph.successors(node_id))
+        page, seen, next_cursor = [], set(), None
+        for edge_direction, edge_label, seq, other in self._iter_neighbor_edges(
+            node_id, label, direction, min_confidence, cursor
+        ):
+            if other in seen:
+                continue
+            if limit is not None and len(page) == limit:
+                next_cursor = last
+                break
+            seen.add(other)
+            page.append(other)
+            last = f"{edge_direction}:{seq}:{edge_label}"
 
         if as_objects:
-            return [
-                BeliefNode.from_dict(self.graph.nodes[n_id]) for n_id in neighbor_ids
-            ]
+            neighbors = [BeliefNode.from_dict(self.graph.nodes[n_id]) for n_id in page]
         else:
-            return [
-                {"id": n_id, **self.graph.nodes[n_id]} for n_id in neighbor_ids
-            ]
+            neighbors = [{"id": n_id, **self.graph.nodes[n_id]} for n_id in page]
+        return {"neighbors": neighbors, "next_cursor": next_cursor}
+
+    @reads
+    def get_neighbors(
+        self,
+        node_id: str,
+        as_objects: bool = True,
+        label: Optional[str] = None,
+        direction: str = "both",
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[BeliefNode]:
+        return self.get_neighbor_page(
+            node_id, as_objects, label, direction, min_confidence, limit, cursor
+        )["neighbors"]
+
+    @reads
+    def get_edges_by_label(self, label: str) -> List[Dict]:
+        return [
+            {"source": u, "target": v, "label": label, **self.graph[u][v][label]}
+            for u, v in self.label_index.get(label, {})
+        ]
 
 
+    @reads
     def has_node(self, node_id: str) -> bool:
         assert node_id, "Node ID must be specified."
         return self.graph.has_node(node_id)
 
+    @reads
     def has_edge(self, from_node: str, to_node: str, label: str) -> bool:
         assert from_node and to_node, "Both from_node and to_node must be specified."
         return self.graph.has_edge(from_node, to_node, key=label)
 
-    def remove_node(self, node_id: str):
+    @writes
+    def remove_node(self, node_id: str, action: str = "Remove Node"):
         assert node_id, "Node ID must be specified."
         if self.graph.has_node(node_id):
-            self.update_node_history(node_id, "Remove Node", self.get_node(node_id).to_dict())
+            self.update_node_history(node_id, action, **self.get_node(node_id).to_dict())
+            for u, v, k in list(self.graph.in_edges(node_id, keys=True)) + list(self.graph.out_edges(node_id, keys=True)):
+                self._unindex_edge(u, v, k)
             self.graph.remove_node(node_id)
 
 
-    def remove_edge(self, from_node: str, to_node: str, label: str):
+    @writes
+    def remove_edge(self, from_node: str, to_node: str, label: str, action: str = "Remove Edge"):
         assert from_node and to_node, "Both from_node and to_node must be specified."
         if self.graph.has_edge(from_node, to_node, key=label):
-            self.update_edge_history(from_node, to_node, "Remove Edge", label=label)
+            confidence = self.graph[from_node][to_node][label].get("confidence")
+            self.update_edge_history(from_node, to_node, action, label=label, confidence=confidence)
             self.graph.remove_edge(from_node, to_node, key=label)
+            self._unindex_edge(from_node, to_node, label)
@@ -0,0 +1,156 @@
+import threading
+from typing import Dict, List, Optional
+
+from graph.graph import BeliefGraph
+
+
+def _force_step(pos, movable, sources, targets, k: float, temperature: float, block: int = 1024):
+    '''
+    One Fruchterman-Reingold step, moving only the rows in `movable`.
+    Repulsion is computed in row blocks so memory stays O(block * n).
+    '''
+    import numpy as np
+
+    # sum_j w_ij (p_i - p_j) == p_i * sum_j w_ij - (w @ p)_i, with
+    # |p_i - p_j|^2 expanded the same way, keeps the hot loop in BLAS.
+    disp = np.zeros((len(movable), 2))
+    sq = np.einsum("ij,ij->i", pos, pos)
+    for start in range(0, len(movable), block):
+        rows = movable[start:start + block]
+        dist2 = np.maximum(sq[rows, None] + sq[None, :] - 2 * pos[rows] @ pos.T, 1e-2)
+        weight = (k * k) / dist2
+        weight[np.arange(len(rows)), rows] = 0.0
+        disp[start:start + block] = pos[rows] * weight.sum(axis=1, keepdims=True) - weight @ pos
+
+    if len(sources):
+        slot = np.full(len(pos), -1)
+        slot[movable] = np.arange(len(movable))
+        delta = pos[sources] - pos[targets]
+        pull = delta * (np.linalg.norm(delta, axis=1, keepdims=True) / k)
+        for ends, sign in ((sources, -1.0), (targets, 1.0)):
+            hit = slot[ends] >= 0
+            np.add.at(disp, slot[ends][hit], sign * pull[hit])
+
+    length = np.linalg.norm(disp, axis=1, keepdims=True) + 1e-9
+    pos[movable] += disp / length * np.minimum(length, temperature)
+
+
+class LayoutCache:
+    '''
+    Server-side node positions for a BeliefGraph, cached per graph version.
+
+    The first call (or one after the graph has more than doubled) runs a full
+    force-directed layout. After that only nodes that are new since the
+    cached version move: each starts at the centroid of its already placed
+    neighbours and is relaxed against the fixed rest of the graph, so a turn
+    that adds a handful of beliefs costs O(new * n) instead of O(n^2 * iters).
+
+    get() returns {"version", "positions": {node_id: {"x", "y"}}, "clusters"},
+    where clusters are community summaries for zoomed-out rendering.
+    '''
+
+    def __init__(
+        self,
+        graph: BeliefGraph,
+        edge_length: float = 200.0,
+        iterations: int = 100,
+        incremental_iterations: int = 30,
+        relayout_fraction: float = 0.5,
+        seed: int = 0,
+    ):
+        self.graph = graph
+        self.edge_length = edge_length
+        self.iterations = iterations
+        self.incremental_iterations = incremental_iterations
+        self.relayout_fraction = relayout_fraction
+        self.seed = seed
+
+        self.version: Optional[int] = None
+        self.positions: Dict[str, tuple] = {}
+        self.clusters: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> Dict:
+        # Graph read lock before our own, in the same order as callers that
+        # wrap get() in a read of their own (user_api.export_graph_with_layout);
+        # the other order deadlocks against a queued writer.
+        with self.graph._lock.read(), self._lock:
+            if self.version != self.graph.version:
+                self._refresh()
+            return {
+                "version": self.version,
+                "positions": {n: {"x": x, "y": y} for n, (x, y) in self.positions.items()},
+                "clusters": self.clusters,
+            }
+
+    def _refresh(self):
+        import numpy as np
+        import networkx as nx
+
+        with self.graph._lock.read():
+            version = self.graph.version
+            g = self.graph.graph
+            node_ids = list(g.nodes)
+            nodes = {n: dict(g.nodes[n]) for n in node_ids}
+            simple = nx.Graph(g)
+
+        index = {n: i for i, n in enumerate(node_ids)}
+        edge_array = np.array([(index[u], index[v]) for u, v in simple.edges if u != v], dtype=int).reshape(-1, 2)
+        sources, targets = edge_array[:, 0], edge_array[:, 1]
+
+        rng = np.random.default_rng(self.seed + version)
+        k = self.edge_length
+        pos = np.zeros((len(node_ids), 2))
+        known = np.array([n in self.positions for n in node_ids], dtype=bool)
+
+        if len(node_ids) and known.sum() >= (1 - self.relayout_fraction) * len(node_ids):
+            for i, n in enumerate(node_ids):
+                if known[i]:
+                    pos[i] = self.positions[n]
+            fresh = np.flatnonzero(~known)
+            for i in fresh:
+                placed = [index[m] for m in simple.neighbors(node_ids[i]) if known[index[m]]]
+                anchor = pos[placed].mean(axis=0) if placed else pos[known].mean(axis=0)
+                pos[i] = anchor + rng.normal(scale=k / 2, size=2)
+            iterations, movable = self.incremental_iterations, fresh
+        else:
+            pos = rng.uniform(-1, 1, size=(len(node_ids), 2)) * k * np.sqrt(max(len(node_ids), 1))
+            iterations, movable = self.iterations, np.arange(len(node_ids))
+
+        if len(movable):
+            start_temperature = k * (2 if iterations == self.iterations else 0.5)
+            for step in range(iterations):
+                _force_step(pos, movable, sources, targets, k, start_temperature * (1 - step / iterations) + 1e-3)
+
+        self.positions = {n: (float(pos[i, 0]), float(pos[i, 1])) for i, n in enumerate(node_ids)}
+        self.clusters = self._summarize(simple, nodes, pos, index)
+        self.version = version
+
+    def _summarize(self, simple, nodes: Dict[str, Dict], pos, index: Dict[str, int]) -> List[Dict]:
+        import numpy as np
+        import networkx as nx
+
+        summaries = []
+        communities = nx.community.label_propagation_communities(simple) if len(simple) else []
+        for i, members in enumerate(sorted(communities, key=len, reverse=True)):
+            members = sorted(members)
+            points = pos[[index[n] for n in members]]
+            centroid = points.mean(axis=0)
+            types: Dict[str, int] = {}
+            for n in members:
+                types[nodes[n].get("type")] = types.get(nodes[n].get("type"), 0) + 1
+            confidences = [nodes[n].get("confidence", 0.0) for n in members]
+            top = sorted(members, key=lambda n: nodes[n].get("confidence", 0.0), reverse=True)[:3]
+
+            summaries.append({
+                "id": f"cluster_{i}",
+                "size": len(members),
+                "x": float(centroid[0]),
+                "y": float(centroid[1]),
+                "radius": float(np.linalg.norm(points - centroid, axis=1).max()),
+                "dominant_type": max(types, key=types.get),
+                "mean_confidence": float(np.mean(confidences)),
+                "top_labels": [nodes[n].get("label") for n in top],
+                "node_ids": members,
+            })
+        return summaries
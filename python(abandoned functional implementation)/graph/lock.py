@@ -0,0 +1,107 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+
+class RWLock:
+    '''
+    Writer-preferring reader/writer lock.
+
+    Re-entrant in the ways BeliefGraph needs: a thread holding the write lock
+    may take it again or take the read lock, and a thread holding the read lock
+    may take it again even while a writer is queued. Upgrading read -> write is
+    not supported and raises RuntimeError instead of deadlocking.
+    '''
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, "read_depth", 0)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if self._read_depth() == 0:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+            self._local.read_depth = self._read_depth() + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth -= 1
+                return
+            self._local.read_depth = self._read_depth() - 1
+            if self._local.read_depth == 0:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if self._read_depth():
+                raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def reads(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def writes(method):
+    # Every successful write bumps self.version so derived caches can tell
+    # they are stale; a write that raises leaves the version alone.
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            result = method(self, *args, **kwargs)
+            self.version += 1
+            return result
+    return wrapper
@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Iterable
+
+from graph.graph import BeliefGraph
+
+
+class DecayPolicy:
+    '''
+    How beliefs age. A node or edge that has been idle for longer than
+    grace_period loses confidence exponentially with the given half_life
+    (both in seconds). Anything whose confidence falls below the prune
+    threshold is removed; if archive_path is set the removed records are
+    appended to it as JSON lines first.
+
+    policy = DecayPolicy(half_life=7 * 86400, node_prune_below=0.05)
+    '''
+
+    def __init__(
+        self,
+        half_life: float = 7 * 24 * 3600,
+        grace_period: float = 24 * 3600,
+        node_prune_below: float = 0.05,
+        edge_prune_below: float = 0.05,
+        archive_path: Optional[str] = None,
+        keep_types: Iterable[str] = (),
+    ):
+        assert half_life > 0, "Half life must be positive."
+        assert grace_period >= 0, "Grace period cannot be negative."
+        assert 0.0 <= node_prune_below <= 1.0, "Node prune threshold must be between 0 and 1."
+        assert 0.0 <= edge_prune_below <= 1.0, "Edge prune threshold must be between 0 and 1."
+
+        self.half_life = half_life
+        self.grace_period = grace_period
+        self.node_prune_below = node_prune_below
+        self.edge_prune_below = edge_prune_below
+        self.archive_path = archive_path
+        self.keep_types = set(keep_types)
+
+
+def _last_activity(data: Dict) -> Optional[float]:
+    if data.get("last_active"):
+        try:
+            return datetime.fromisoformat(data["last_active"]).timestamp()
+        except (TypeError, ValueError):
+            pass
+    latest = None
+    for entry in data.get("history") or []:
+        timestamp = entry.get("timestamp") if isinstance(entry, dict) else None
+        if not timestamp:
+            continue
+        try:
+            ts = datetime.fromisoformat(timestamp).timestamp()
+        except ValueError:
+            continue
+        if latest is None or ts > latest:
+            latest = ts
+    return latest
+
+
+class MaintenanceScheduler:
+    '''
+    Periodically decays and prunes a BeliefGraph on a background thread.
+
+    Each pass snapshots confidences and idle times under the read lock,
+    computes every decay factor at once with NumPy, then takes the write lock
+    only to apply them and prune. Confidences are scaled rather than
+    overwritten, so tool calls that land between the two phases are kept.
+    Idle time is measured from a node's last_active, which BeliefGraph sets
+    on every write that touches the node, edge changes included. Nodes saved
+    before last_active existed fall back to their newest history timestamp,
+    and nodes with neither are aged from when the scheduler first saw them.
+    '''
+
+    def __init__(self, graph: BeliefGraph, policy: Optional[DecayPolicy] = None, interval: float = 300.0):
+        assert interval > 0, "Interval must be positive."
+        self.graph = graph
+        self.policy = policy or DecayPolicy()
+        self.interval = interval
+
+        self.first_seen: Dict[str, float] = {}
+        self.last_run: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="belief-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"\n[Maintenance pass failed: {e}]")
+
+    def run_once(self, now: Optional[float] = None) -> Dict[str, int]:
+        import numpy as np
+
+        now = time.time() if now is None else now
+        elapsed = 0.0 if self.last_run is None else max(0.0, now - self.last_run)
+        self.last_run = now
+        policy = self.policy
+
+        # ── snapshot ──
+        with self.graph._lock.read():
+            g = self.graph.graph
+            node_ids = list(g.nodes)
+            node_conf = np.fromiter((g.nodes[n].get("confidence", 0.0) for n in node_ids), float, len(node_ids))
+            last_seen = np.empty(len(node_ids))
+            for i, n in enumerate(node_ids):
+                ts = _last_activity(g.nodes[n])
+                last_seen[i] = ts if ts is not None else self.first_seen.setdefault(n, now)
+
+            position = {n: i for i, n in enumerate(node_ids)}
+            edges = list(g.edges(keys=True))
+            edge_conf = np.fromiter((g[u][v][k].get("confidence", 1.0) for u, v, k in edges), float, len(edges))
+            sources = np.fromiter((position[u] for u, _, _ in edges), int, len(edges))
+            targets = np.fromiter((position[v] for _, v, _ in edges), int, len(edges))
+
+        live = set(node_ids)
+        self.first_seen = {n: ts for n, ts in self.first_seen.items() if n in live}
+
+        # ── decay factors ──
+        # Only time past the grace period and since the previous pass counts,
+        # so repeated passes compound to exactly half_life-based decay.
+        node_idle = now - last_seen
+        node_decay_time = np.clip(np.minimum(node_idle - policy.grace_period, elapsed), 0.0, None)
+        node_factor = np.power(0.5, node_decay_time / policy.half_life)
+
+        edge_idle = np.minimum(node_idle[sources], node_idle[targets]) if len(edges) else np.empty(0)
+        edge_decay_time = np.clip(np.minimum(edge_idle - policy.grace_period, elapsed), 0.0, None)
+        edge_factor = np.power(0.5, edge_decay_time / policy.half_life)
+
+        node_doomed = (node_conf * node_factor) < policy.node_prune_below
+        edge_doomed = (edge_conf * edge_factor) < policy.edge_prune_below
+
+        stats = {"decayed_nodes": 0, "decayed_edges": 0, "pruned_nodes": 0, "pruned_edges": 0}
+
+        # ── apply ──
+        with self.graph._lock.write():
+            g = self.graph.graph
+            archived = []
+
+            for i in np.flatnonzero(node_factor < 1.0):
+                n = node_ids[i]
+                if g.has_node(n):
+                    g.nodes[n]["confidence"] = float(g.nodes[n].get("confidence", 0.0) * node_factor[i])
+                    stats["decayed_nodes"] += 1
+
+            for i in np.flatnonzero(edge_factor < 1.0):
+                u, v, k = edges[i]
+                if g.has_edge(u, v, key=k):
+                    g[u][v][k]["confidence"] = float(g[u][v][k].get("confidence", 1.0) * edge_factor[i])
+                    stats["decayed_edges"] += 1
+
+            # Removals bump the version through @writes; in-place decay has to
+            # do it here, and only when something changed so derived caches
+            # (e.g. LayoutCache) survive idle passes.
+            if stats["decayed_nodes"] or stats["decayed_edges"]:
+                self.graph.version += 1
+
+            for i in np.flatnonzero(edge_doomed):
+                u, v, k = edges[i]
+                if g.has_edge(u, v, key=k) and g[u][v][k].get("confidence", 1.0) < policy.edge_prune_below:
+                    archived.append({"kind": "edge", "source": u, "target": v, "label": k, **g[u][v][k]})
+                    self.graph.remove_edge(u, v, k, action="Prune Edge")
+                    stats["pruned_edges"] += 1
+
+            for i in np.flatnonzero(node_doomed):
+                n = node_ids[i]
+                if not g.has_node(n):
+                    continue
+                data = g.nodes[n]
+                if data.get("type") in policy.keep_types or data.get("confidence", 0.0) >= policy.node_prune_below:
+                    continue
+                archived.append({"kind": "node", "id": n, **data})
+                archived.extend(
+                    {"kind": "edge", "source": u, "target": v, "label": k, **d}
+                    for u, v, k, d in list(g.in_edges(n, keys=True, data=True)) + list(g.out_edges(n, keys=True, data=True))
+                )
+                self.graph.remove_node(n, action="Prune Node")
+                stats["pruned_nodes"] += 1
+
+        if archived and policy.archive_path:
+            with open(policy.archive_path, "a") as f:
+                for record in archived:
+                    f.write(json.dumps({"archived_at": now, **record}, default=str) + "\n")
+
+        return stats
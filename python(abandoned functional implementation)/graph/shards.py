@@ -0,0 +1,247 @@
+import atexit
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from graph.node import BeliefNode
+
+
+def _stable_hash(value: str) -> int:
+    # hash() is salted per process, so workers would disagree on placement.
+    return zlib.crc32(value.encode("utf-8"))
+
+
+def _normalize_label(label) -> str:
+    return " ".join(str(label).lower().split())
+
+
+class GraphShards:
+    '''
+    A partitioned snapshot of a BeliefGraph.
+
+    Nodes are assigned to shards by a stable hash of their id, or by
+    community (label propagation, greedily packed so shards stay balanced).
+    Each shard keeps its nodes as (node_id, attributes) pairs, attributes
+    exactly as stored in the graph, and the edges whose endpoints both live
+    in it; edges that span shards go into the cross_edges table and are
+    owned by the source's shard for whole-graph operations.
+
+    Numeric columns (node confidences, edge endpoints and confidences) are
+    also kept as flat NumPy arrays, ordered so that each shard's nodes and
+    inbound edges are one contiguous slice (node_offsets / inbound_offsets).
+    Analytics jobs share them with worker processes through shared memory
+    and each worker reads only its own shard's slice.
+    '''
+
+    def __init__(self, num_shards: int):
+        assert num_shards > 0, "Shard count must be positive."
+        self.num_shards = num_shards
+        self.assignment: Dict[str, int] = {}
+        self.nodes: List[List[Tuple[str, Dict]]] = [[] for _ in range(num_shards)]
+        self.edges: List[List[Dict]] = [[] for _ in range(num_shards)]
+        self.cross_edges: List[Dict] = []
+        self.cross_out: List[List[Dict]] = [[] for _ in range(num_shards)]
+
+        self.node_ids: List[str] = []
+        self.columns: Dict[str, object] = {}
+
+    @staticmethod
+    def from_graph(graph, num_shards: int, by: str = "hash") -> "GraphShards":
+        import numpy as np
+
+        assert by in ("hash", "community"), "Partition must be by 'hash' or 'community'."
+        shards = GraphShards(num_shards)
+
+        with graph._lock.read():
+            g = graph.graph
+            node_ids = list(g.nodes)
+
+            if by == "hash":
+                shards.assignment = {n: _stable_hash(n) % num_shards for n in node_ids}
+            else:
+                import networkx as nx
+                load = [0] * num_shards
+                communities = nx.community.label_propagation_communities(nx.Graph(g)) if node_ids else []
+                for members in sorted(communities, key=len, reverse=True):
+                    target = load.index(min(load))
+                    load[target] += len(members)
+                    for n in members:
+                        shards.assignment[n] = target
+
+            for n in node_ids:
+                shards.nodes[shards.assignment[n]].append((n, dict(g.nodes[n])))
+
+            edges = []
+            for u, v, k, d in g.edges(keys=True, data=True):
+                edge = {"source": u, "target": v, "label": k, **d}
+                edges.append(edge)
+                if shards.assignment[u] == shards.assignment[v]:
+                    shards.edges[shards.assignment[u]].append(edge)
+                else:
+                    shards.cross_edges.append(edge)
+                    shards.cross_out[shards.assignment[u]].append(edge)
+
+        # Node order groups shards together; edges are grouped by the shard
+        # of their target, which is where their support is accumulated.
+        shards.node_ids = [n for part in shards.nodes for n, _ in part]
+        index = {n: i for i, n in enumerate(shards.node_ids)}
+        node_shard = np.array([shards.assignment[n] for n in shards.node_ids], dtype=np.int64)
+        edge_target = np.array([index[e["target"]] for e in edges], dtype=np.int64)
+        inbound_order = np.argsort(node_shard[edge_target], kind="stable") if len(edges) else np.empty(0, dtype=np.int64)
+
+        shards.columns = {
+            "node_confidence": np.array([data.get("confidence", 0.0) for part in shards.nodes for _, data in part], dtype=float),
+            "node_offsets": np.concatenate(([0], np.cumsum([len(part) for part in shards.nodes]))).astype(np.int64),
+            "edge_source": np.array([index[e["source"]] for e in edges], dtype=np.int64)[inbound_order],
+            "edge_target": edge_target[inbound_order],
+            "edge_confidence": np.array([e.get("confidence", 1.0) for e in edges], dtype=float)[inbound_order],
+            "inbound_offsets": np.searchsorted(node_shard[edge_target[inbound_order]], np.arange(num_shards + 1)).astype(np.int64),
+        }
+        return shards
+
+    def shard_of(self, node_id: str) -> int:
+        return self.assignment[node_id]
+
+    def owned_edges(self, shard: int) -> List[Dict]:
+        return self.edges[shard] + self.cross_out[shard]
+
+
+# ───────────────────────────  WORKERS  ───────────────────────────
+# Module-level so they can be pickled by reference into pool processes.
+
+def _validate_shard(nodes: List[Tuple[str, Dict]], edges: List[Dict]) -> List[str]:
+    # Same checks and messages as BeliefGraph.validate_graph's serial path.
+    errors = []
+    for node_id, data in nodes:
+        try:
+            BeliefNode.from_dict(data)
+        except Exception as e:
+            errors.append(f"Node {node_id} failed validation: {e}")
+    for edge in edges:
+        if not isinstance(edge["label"], str):
+            errors.append(f"Edge label (key) must be a string between {edge['source']} and {edge['target']}")
+    return errors
+
+
+def _support_kernel(columns: Dict, shard: int):
+    '''
+    Support for the nodes of one shard: the sum over inbound edges of edge
+    confidence times source confidence. Returns the shard's slice of scores.
+    '''
+    import numpy as np
+
+    lo, hi = columns["node_offsets"][shard], columns["node_offsets"][shard + 1]
+    e_lo, e_hi = columns["inbound_offsets"][shard], columns["inbound_offsets"][shard + 1]
+    weight = columns["edge_confidence"][e_lo:e_hi] * columns["node_confidence"][columns["edge_source"][e_lo:e_hi]]
+    support = np.bincount(columns["edge_target"][e_lo:e_hi] - lo, weights=weight, minlength=hi - lo)
+    return columns["node_confidence"][lo:hi] + support
+
+
+def _support_shard_shared(specs: Dict[str, Tuple[str, Tuple[int, ...], str]], shard: int):
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    blocks, columns = [], {}
+    try:
+        for key, (name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            columns[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return _support_kernel(columns, shard).copy()
+    finally:
+        columns.clear()
+        for block in blocks:
+            block.close()
+
+
+def _label_groups(nodes: List[Tuple[str, Dict]]) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for node_id, data in nodes:
+        groups.setdefault(_normalize_label(data["label"]), []).append(node_id)
+    return groups
+
+
+# ────────────────────────────  JOBS  ─────────────────────────────
+# Every job maps over shards. With workers <= 1 the shards are processed in
+# this process with no pool and no shared memory. Pool processes are kept
+# between jobs, so only the first job (or a change of worker count) pays to
+# start them.
+
+_pool: ProcessPoolExecutor = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+atexit.register(_shutdown_pool)
+
+
+def _run(workers: int, fn, calls: List[tuple]) -> list:
+    global _pool, _pool_workers
+    if workers <= 1 or len(calls) <= 1:
+        return [fn(*args) for args in calls]
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        pool = _pool
+    return list(pool.map(fn, *zip(*calls)))
+
+
+def validate(shards: GraphShards, workers: int = 1) -> List[str]:
+    calls = [(shards.nodes[s], shards.owned_edges(s)) for s in range(shards.num_shards)]
+    return [error for errors in _run(workers, _validate_shard, calls) for error in errors]
+
+
+def rank_support(shards: GraphShards, workers: int = 1) -> List[Tuple[str, float]]:
+    '''
+    Score each belief by its own confidence plus the confidence-weighted
+    support flowing in along its edges, highest first. Each shard scores its
+    own nodes from its inbound edges; with a pool, the columns are placed in
+    shared memory once instead of being pickled to every worker.
+    '''
+    import numpy as np
+
+    shard_ids = range(shards.num_shards)
+    if workers <= 1:
+        parts = [_support_kernel(shards.columns, s) for s in shard_ids]
+    else:
+        from multiprocessing import shared_memory
+
+        blocks, specs = [], {}
+        try:
+            for key, column in shards.columns.items():
+                block = shared_memory.SharedMemory(create=True, size=max(column.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(column.shape, dtype=column.dtype, buffer=block.buf)[:] = column
+                specs[key] = (block.name, column.shape, column.dtype.str)
+            parts = _run(workers, _support_shard_shared, [(specs, s) for s in shard_ids])
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    scores = np.concatenate(parts) if parts else np.empty(0)
+    order = np.argsort(-scores, kind="stable")
+    return [(shards.node_ids[i], float(scores[i])) for i in order]
+
+
+def find_duplicates(shards: GraphShards, workers: int = 1) -> List[List[str]]:
+    '''
+    Groups of beliefs whose labels match after case and whitespace folding.
+    Each shard groups its own nodes; the per-shard groups are then merged so
+    duplicates that landed in different shards are still found.
+    '''
+    merged: Dict[str, List[str]] = {}
+    for groups in _run(workers, _label_groups, [(part,) for part in shards.nodes]):
+        for label, ids in groups.items():
+            merged.setdefault(label, []).extend(ids)
+    return sorted(sorted(ids) for ids in merged.values() if len(ids) > 1)
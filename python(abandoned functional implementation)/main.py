@@ -1,28 +1,108 @@
 import os
+import sys
 import json
-from dotenv import load_dotenv
-from openai import OpenAI
 from api import tools, user_api
 
 
 # ────────────────────────────  ENV  ────────────────────────────
-load_dotenv()
-API_KEY        = os.getenv("OPENAI_API_KEY")
-FIRST_PROMPT   = os.getenv("SYSTEM_PROMPT_1")
-FIRST_5_PROMPT = os.getenv("SYSTEM_PROMPT_1_5")
-SECOND_PROMPT  = os.getenv("SYSTEM_PROMPT_2")
-
-if not API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in environment")
-if not FIRST_PROMPT or not SECOND_PROMPT:
-    raise ValueError("Missing prompt(s) in environment")
+# dotenv, openai and networkx are all imported lazily so that a cold start only
+# pays for what the invocation actually uses. Call prewarm() to pay it upfront.
+API_KEY        = None
+FIRST_PROMPT   = None
+FIRST_5_PROMPT = None
+SECOND_PROMPT  = None
+_env_loaded    = False
+
+def load_env() -> None:
+    global API_KEY, FIRST_PROMPT, FIRST_5_PROMPT, SECOND_PROMPT, _env_loaded
+    if _env_loaded:
+        return
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    API_KEY        = os.getenv("OPENAI_API_KEY")
+    FIRST_PROMPT   = os.getenv("SYSTEM_PROMPT_1")
+    FIRST_5_PROMPT = os.getenv("SYSTEM_PROMPT_1_5")
+    SECOND_PROMPT  = os.getenv("SYSTEM_PROMPT_2")
+
+    if not API_KEY:
+        raise ValueError("OPENAI_API_KEY not found in environment")
+    if not FIRST_PROMPT or not SECOND_PROMPT:
+        raise ValueError("Missing prompt(s) in environment")
+    _env_loaded = True
 
 # ────────────────────────  OPENAI CLIENT  ──────────────────────
-client = OpenAI(api_key=API_KEY)
-function_schemas = [
-    {"type": "function", "function": schema}
-    for schema in tools.tool_schemas.values()
-]
+_client = None
+_function_schemas: list | None = None
+
+def get_client():
+    global _client
+    if _client is None:
+        load_env()
+        from openai import OpenAI
+        _client = OpenAI(api_key=API_KEY)
+    return _client
+
+def get_function_schemas() -> list:
+    global _function_schemas
+    if _function_schemas is None:
+        _function_schemas = [
+            {"type": "function", "function": schema}
+            for schema in tools.tool_schemas.values()
+        ]
+    return _function_schemas
+
+# ─────────────────────────  PREWARM  ───────────────────────────
+def prewarm(graph_path: str | None = None) -> None:
+    """
+    Resolve every lazy import, the client, the tool schemas and (optionally)
+    the persisted graph in the current process. A pre-fork server should call
+    this once in the parent so forked children inherit a warm, copy-on-write
+    state (see serve_prefork); `python main.py --prewarm` does it before
+    entering the REPL.
+    """
+    get_client()
+    get_function_schemas()
+    import networkx  # noqa: F401
+    if graph_path:
+        result = user_api.load_graph(graph_path)
+        if result["status"] != "ok":
+            raise ValueError(f"Failed to load graph {graph_path}: {result['message']}")
+
+def _serve_child(queue, handler) -> None:
+    while True:
+        request = queue.get()
+        if request is None:
+            return
+        try:
+            handler(request)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+
+def serve_prefork(handler, workers: int, requests, graph_path: str | None = None) -> None:
+    """
+    Prewarm once, then fork `workers` children that each pull requests from a
+    shared queue and pass them to handler. Children inherit the warm client,
+    schemas and graph copy-on-write, so none of them pays the cold start.
+    Each child owns its copy of the graph: writes made while serving one
+    request are not seen by the other children.
+    """
+    assert workers > 0, "Worker count must be positive."
+    prewarm(graph_path)
+
+    import multiprocessing
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    children = [ctx.Process(target=_serve_child, args=(queue, handler)) for _ in range(workers)]
+    for child in children:
+        child.start()
+    for request in requests:
+        queue.put(request)
+    for _ in children:
+        queue.put(None)
+    for child in children:
+        child.join()
 
 # ─────────────────────  CONVERSATION STATE  ────────────────────
 prompt1_history: list       = []
@@ -30,10 +110,50 @@ prompt2_history: list       = []
 prompt1_5_history: list     = []
 last_graph_diff: dict | None = None
 tool_call_log: list         = []
+MAX_TOOL_REPAIR_ROUNDS      = 2
+
+# ─────────────────────────  TOOL CALLS  ────────────────────────
+def run_tool_calls(client, messages: list, msg, temperature: float) -> None:
+    """
+    Execute msg's tool calls through the validating dispatcher. If any call is
+    rejected, the structured errors are sent back to the model as tool results
+    so it can correct its arguments without waiting for the next user turn.
+    """
+    for round_no in range(MAX_TOOL_REPAIR_ROUNDS + 1):
+        if not msg.tool_calls:
+            return
+
+        tool_messages = []
+        failed        = False
+        for tc in msg.tool_calls:
+            outcome = tools.call_tool(tc.function.name, tc.function.arguments)
+            args    = outcome.pop("args", tc.function.arguments)
+            failed  = failed or outcome["status"] != "ok"
+            tool_call_log.append(
+                {"tool": tc.function.name, "args": args, "result": outcome.get("result", outcome)}
+            )
+            tool_messages.append(
+                {"role": "tool", "tool_call_id": tc.id, "content": json.dumps(outcome, default=str)}
+            )
+
+        if not failed or round_no == MAX_TOOL_REPAIR_ROUNDS:
+            return
+
+        messages = [*messages, msg, *tool_messages]
+        msg = client.chat.completions.create(
+            model="gpt-4o",
+            messages=messages,
+            tools=get_function_schemas(),
+            tool_choice="auto",
+            temperature=temperature,
+            max_tokens=2048,
+        ).choices[0].message
+
 # ──────────────────────────  PROMPT 1  ─────────────────────────
 def run_prompt1(user_input: str) -> str:
     global last_graph_diff, tool_call_log
 
+    client     = get_client()
     prev_graph = user_api.get_graph_dict()
 
     system_graph_info = (
@@ -52,7 +172,7 @@ def run_prompt1(user_input: str) -> str:
     response = client.chat.completions.create(
         model="gpt-4o",
         messages=prompt1_input,
-        tools=function_schemas,
+        tools=get_function_schemas(),
         tool_choice="auto",
         temperature=0.7,
         max_tokens=2048,
@@ -66,16 +186,7 @@ def run_prompt1(user_input: str) -> str:
     ])
 
     tool_call_log = []
-
-    if msg.tool_calls:
-        for tc in msg.tool_calls:
-            fn_name = tc.function.name
-            args    = json.loads(tc.function.arguments)
-            if fn_name in tools.tool_registry:
-                result = tools.tool_registry[fn_name](**args)
-                tool_call_log.append(
-                    {"tool": fn_name, "args": args, "result": result}
-                )
+    run_tool_calls(client, prompt1_input, msg, temperature=0.7)
 
     current_graph   = user_api.get_graph_dict()
     last_graph_diff = user_api.get_graph_diff(prev_graph, current_graph)
@@ -86,6 +197,7 @@ def run_prompt1(user_input: str) -> str:
 def run_prompt1_5(user_input: str) -> str:
     global last_graph_diff, tool_call_log
 
+    client     = get_client()
     prev_graph = user_api.get_graph_dict()
     full_graph = user_api.export_graph_json()
 
@@ -106,7 +218,7 @@ def run_prompt1_5(user_input: str) -> str:
     response = client.chat.completions.create(
         model="gpt-4o",
         messages=prompt_input,
-        tools=function_schemas,
+        tools=get_function_schemas(),
         tool_choice="auto",
         temperature=0.3,
         max_tokens=2048,
@@ -114,18 +226,7 @@ def run_prompt1_5(user_input: str) -> str:
 
     msg = response.choices[0].message
     tool_call_log = []
-
-    if msg.tool_calls:
-        for tc in msg.tool_calls:
-            fn_name = tc.function.name
-            args    = json.loads(tc.function.arguments)
-            if fn_name in tools.tool_registry:
-                result = tools.tool_registry[fn_name](**args)
-                tool_call_log.append(
-                    {"tool": fn_name, "args": args, "result": result}
-                )
-            else:
-                print(f"\n[Prompt 1.5 Unknown tool: {fn_name}]")
+    run_tool_calls(client, prompt_input, msg, temperature=0.3)
 
     current_graph   = user_api.get_graph_dict()
     last_graph_diff = user_api.get_graph_diff(prev_graph, current_graph)
@@ -134,6 +235,7 @@ def run_prompt1_5(user_input: str) -> str:
     return msg.content or "(No content)"
 # ──────────────────────────  PROMPT 2  ─────────────────────────
 def run_prompt2(reasoning_result: str, last_user_msg: str) -> str:
+    client       = get_client()
     full_graph   = user_api.export_graph_json()
     tool_summary = "\n".join(
         f"- `{c['tool']}` with {json.dumps(c['args'])}"
@@ -186,7 +288,7 @@ def print_full_summary(user_input: str,
         for call in tool_calls:
             print(f"- Tool: {call['tool']}")
             print(f"  Arguments: {json.dumps(call['args'], indent=2)}")
-            print(f"  Result: {json.dumps(call['result'], indent=2)}")
+            print(f"  Result: {json.dumps(call['result'], indent=2, default=str)}")
 
     print("\n[Prompt 2 Reflection Output]:")
     print(reflection_output)
@@ -198,25 +300,62 @@ def print_full_summary(user_input: str,
     print("\n────────────────────────────────────────────────────")
 
 # ─────────────────────────  MAIN LOOP  ─────────────────────────
+def start_maintenance():
+    """
+    Start background confidence decay/pruning when BELIEF_DECAY_INTERVAL
+    (seconds) is set. BELIEF_DECAY_HALF_LIFE, BELIEF_PRUNE_BELOW and
+    BELIEF_ARCHIVE_PATH tune the default policy.
+    """
+    interval = os.getenv("BELIEF_DECAY_INTERVAL")
+    if not interval:
+        return None
+
+    from api.shared_graph import shared_graph
+    from graph.maintenance import MaintenanceScheduler, DecayPolicy
+
+    prune_below = float(os.getenv("BELIEF_PRUNE_BELOW", "0.05"))
+    policy = DecayPolicy(
+        half_life=float(os.getenv("BELIEF_DECAY_HALF_LIFE", str(7 * 24 * 3600))),
+        node_prune_below=prune_below,
+        edge_prune_below=prune_below,
+        archive_path=os.getenv("BELIEF_ARCHIVE_PATH"),
+    )
+    scheduler = MaintenanceScheduler(shared_graph, policy, interval=float(interval))
+    scheduler.start()
+    return scheduler
+
+def run_turn(user_input: str) -> None:
+    reasoning_output   = run_prompt1(user_input)
+    justification_1_5  = run_prompt1_5(user_input)
+    reflection_output  = run_prompt2(reasoning_output + "\n\n" + justification_1_5, user_input)
+
+    print_full_summary(
+        user_input,
+        reasoning_output,
+        justification_1_5,
+        tool_call_log,
+        reflection_output
+    )
+
 def main_loop() -> None:
+    load_env()
+    start_maintenance()
     while True:
         user_input = input("\n[User]: ")
         if user_input.lower().strip() in {"exit", "quit"}:
             break
-
-        reasoning_output   = run_prompt1(user_input)
-        justification_1_5  = run_prompt1_5(user_input)
-        reflection_output  = run_prompt2(reasoning_output + "\n\n" + justification_1_5, user_input)
-
-        print_full_summary(
-            user_input,
-            reasoning_output,
-            justification_1_5,
-            tool_call_log,
-            reflection_output
-        )
+        run_turn(user_input)
 
 
 # ────────────────────────────  RUN  ────────────────────────────
+# `python main.py --workers N < prompts.txt` serves one prompt per stdin line
+# from N pre-forked children instead of running the interactive REPL.
 if __name__ == "__main__":
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+        prompts = (line.strip() for line in sys.stdin if line.strip())
+        serve_prefork(run_turn, workers, prompts, os.getenv("BELIEF_GRAPH_PATH"))
+        sys.exit(0)
+    if "--prewarm" in sys.argv:
+        prewarm(os.getenv("BELIEF_GRAPH_PATH"))
     main_loop()
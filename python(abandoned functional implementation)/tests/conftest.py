@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The packages (api, graph) are imported relative to the project root, the
+# same way main.py does it.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
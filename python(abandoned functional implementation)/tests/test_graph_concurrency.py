@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import threading
+
+import pytest
+
+from graph.graph import BeliefGraph
+from graph.lock import RWLock
+from graph.node import BeliefNode
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def stress(threads: int, iterations: int = 300):
+    '''
+    Hammer one graph from `threads` workers, each doing add_node, add_edge
+    and get_neighbors in a loop. Returns (graph, ids, ops per second).
+    '''
+    graph = BeliefGraph()
+    hub = graph.add_node(BeliefNode("hub", "core", 0.5))
+
+    def work(worker: int):
+        ids = []
+        previous = hub
+        for i in range(iterations):
+            node_id = graph.add_node(BeliefNode(f"{worker}-{i}", "t", 0.5))
+            graph.add_edge(hub, node_id, f"label_{worker % 3}", 0.5)
+            graph.add_edge(previous, node_id, "follows", 0.5)
+            graph.get_neighbors(hub, as_objects=False, label=f"label_{worker % 3}", limit=10)
+            graph.get_neighbors(node_id, as_objects=False)
+            previous = node_id
+            ids.append(node_id)
+        return ids
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(work, range(threads)))
+    elapsed = time.perf_counter() - start
+
+    ids = [node_id for worker_ids in results for node_id in worker_ids]
+    return graph, ids, threads * iterations * 5 / elapsed
+
+
+def assert_consistent(graph: BeliefGraph, ids: list, expected: int):
+    assert len(ids) == len(set(ids)) == expected
+    assert graph.node_counter == expected + 1
+
+    edges = set(graph.graph.edges(keys=True))
+    indexed = {(u, v, label) for label, pairs in graph.label_index.items() for u, v in pairs}
+    assert indexed == edges
+
+    out_indexed = {(u, v, label) for u, labels in graph.out_index.items() for label, vs in labels.items() for v in vs}
+    in_indexed = {(u, v, label) for v, labels in graph.in_index.items() for label, us in labels.items() for u in us}
+    assert out_indexed == in_indexed == edges
+
+
+def test_concurrent_mutations_stay_consistent():
+    for threads in THREAD_COUNTS:
+        graph, ids, ops = stress(threads)
+        assert_consistent(graph, ids, threads * 300)
+        print(f"\n{threads} threads: {ops:,.0f} ops/s")
+
+
+def test_rwlock_reentry_and_exclusion():
+    lock = RWLock()
+    with lock.write():
+        with lock.write(), lock.read():
+            pass
+    with lock.read():
+        with lock.read():
+            pass
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+
+    inside = []
+
+    def read():
+        with lock.read():
+            inside.append(True)
+
+    lock.acquire_write()
+    reader = threading.Thread(target=read)
+    reader.start()
+    reader.join(0.1)
+    assert not inside, "reader entered while the write lock was held"
+    lock.release_write()
+    reader.join(1.0)
+    assert inside
+
+
+def test_failed_write_keeps_version():
+    graph = BeliefGraph()
+    node_id = graph.add_node(BeliefNode("a", "t", 0.5))
+    version = graph.version
+    with pytest.raises(ValueError):
+        graph.add_edge(node_id, "missing", "supports")
+    assert graph.version == version
+
+
+# python -m tests.test_graph_concurrency
+if __name__ == "__main__":
+    for threads in THREAD_COUNTS:
+        graph, ids, ops = stress(threads, iterations=1000)
+        assert_consistent(graph, ids, threads * 1000)
+        print(f"{threads} threads: {ops:,.0f} ops/s")
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cold `import main` must stay cheap: the heavy dependencies are only loaded
+# on first use (see main.prewarm).
+IMPORT_BUDGET_SECONDS = 0.5
+DEFERRED_MODULES = ("networkx", "openai", "dotenv", "numpy")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def _measure():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_defers_heavy_modules():
+    assert _measure()["loaded"] == []
+
+
+def test_import_main_within_budget():
+    # Best of three to keep the check stable on a noisy machine.
+    elapsed = min(_measure()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"import main took {elapsed:.3f}s"
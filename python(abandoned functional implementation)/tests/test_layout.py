@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+
+from api import user_api
+from graph.graph import BeliefGraph
+from graph.layout import LayoutCache
+from graph.maintenance import DecayPolicy, MaintenanceScheduler
+from graph.node import BeliefNode
+
+
+def _chain(length: int):
+    graph = BeliefGraph()
+    ids = [graph.add_node(BeliefNode(f"n{i}", "t", 0.5)) for i in range(length)]
+    for a, b in zip(ids, ids[1:]):
+        graph.add_edge(a, b, "leads_to", 0.5)
+    return graph, ids
+
+
+def test_incremental_layout_keeps_existing_positions():
+    graph, ids = _chain(40)
+    cache = LayoutCache(graph)
+    before = cache.get()["positions"]
+
+    new = graph.add_node(BeliefNode("new", "t", 0.5))
+    graph.add_edge(ids[0], new, "leads_to", 0.5)
+    after = cache.get()
+
+    assert all(after["positions"][n] == before[n] for n in ids)
+    assert new in after["positions"]
+    assert sum(c["size"] for c in after["clusters"]) == 41
+
+
+def test_idle_maintenance_pass_keeps_layout_cache():
+    graph, _ = _chain(10)
+    cache = LayoutCache(graph)
+    version = cache.get()["version"]
+
+    # Every node was just touched, so nothing is past the grace period.
+    scheduler = MaintenanceScheduler(graph, DecayPolicy(half_life=100, grace_period=60))
+    now = time.time()
+    scheduler.run_once(now)
+    stats = scheduler.run_once(now + 30)
+
+    assert not any(stats.values())
+    assert graph.version == version
+    assert cache.get()["version"] == version
+
+
+def test_export_positions_every_node_under_writes(monkeypatch):
+    graph, _ = _chain(20)
+    monkeypatch.setattr(user_api, "graph", graph)
+    monkeypatch.setattr(user_api, "layout", LayoutCache(graph, incremental_iterations=2))
+
+    def write():
+        for _ in range(10):
+            graph.add_node(BeliefNode("late", "t", 0.5))
+            time.sleep(0.001)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(20):
+            nodes = json.loads(user_api.export_graph_with_layout())["nodes"]
+            assert all(node["position"] is not None for node in nodes)
+    finally:
+        writer.join()
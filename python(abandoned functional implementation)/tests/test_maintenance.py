@@ -0,0 +1,82 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from graph.graph import BeliefGraph
+from graph.maintenance import DecayPolicy, MaintenanceScheduler
+from graph.node import BeliefNode
+
+
+def _backdate(graph: BeliefGraph, seconds: float):
+    stamp = datetime.fromtimestamp(time.time() - seconds).isoformat()
+    for _, data in graph.graph.nodes(data=True):
+        data["last_active"] = stamp
+        for entry in data["history"]:
+            entry["timestamp"] = stamp
+
+
+@pytest.fixture
+def graph():
+    graph = BeliefGraph()
+    for label, confidence in (("active", 0.5), ("stale", 0.5), ("faint", 0.08)):
+        graph.add_node(BeliefNode(label, "t", confidence))
+    graph.add_edge("belief_1", "belief_2", "supports", 0.5)
+    _backdate(graph, 1000)
+    return graph
+
+
+def test_writes_mark_activity_without_flooding_history(graph):
+    before = {n: data["last_active"] for n, data in graph.graph.nodes(data=True)}
+    graph.add_history("belief_0", "Reinforced")
+    graph.update_node("belief_1", confidence=0.7, label="stale")
+    graph.add_edge("belief_0", "belief_2", "supports", 0.5)
+
+    for n in ("belief_0", "belief_1", "belief_2"):
+        assert graph.graph.nodes[n]["last_active"] > before[n]
+    assert [e["action"] for e in graph.get_node("belief_0").history] == ["Node Created", "Reinforced"]
+    assert [e["action"] for e in graph.get_node("belief_1").history] == ["Node Created", "Update Node: confidence"]
+    assert [e["action"] for e in graph.get_node("belief_2").history] == ["Node Created"]
+
+
+def test_update_without_changes_adds_no_history(graph):
+    graph.update_node("belief_0", confidence=0.5, label="active")
+    assert [e["action"] for e in graph.get_node("belief_0").history] == ["Node Created"]
+
+
+def test_edge_activity_keeps_node_from_decaying(graph):
+    scheduler = MaintenanceScheduler(graph, DecayPolicy(half_life=100, grace_period=10))
+    now = time.time()
+    scheduler.run_once(now - 200)
+
+    graph.update_edge_confidence("belief_1", "belief_2", "supports", 0.6)
+    scheduler.run_once(now)
+
+    assert graph.get_node("belief_1").confidence == pytest.approx(0.5)
+    assert graph.get_node("belief_0").confidence == pytest.approx(0.5 * 0.25)
+
+
+def test_reinforced_node_is_not_decayed(graph):
+    scheduler = MaintenanceScheduler(graph, DecayPolicy(half_life=100, grace_period=10))
+    now = time.time()
+    scheduler.run_once(now - 200)
+
+    graph.update_node("belief_0", confidence=0.9)
+    scheduler.run_once(now)
+
+    assert graph.get_node("belief_0").confidence == pytest.approx(0.9)
+    assert graph.get_node("belief_1").confidence == pytest.approx(0.5 * 0.25)
+
+
+def test_prunes_and_records_history(graph, tmp_path):
+    archive = tmp_path / "archive.jsonl"
+    scheduler = MaintenanceScheduler(graph, DecayPolicy(half_life=100, grace_period=10, archive_path=str(archive)))
+    now = time.time()
+    scheduler.run_once(now - 100)
+    stats = scheduler.run_once(now)
+
+    assert stats["pruned_nodes"] == 1
+    assert not graph.has_node("belief_2")
+    assert not graph.out_index.get("belief_1")
+    assert "Action: Prune Node" in graph.get_node_history()[-1]
+    assert len(archive.read_text().splitlines()) == 2
@@ -0,0 +1,62 @@
+import json
+
+from api import tools
+from graph.graph import BeliefGraph
+from graph.node import BeliefNode
+
+
+def _hub(spokes: int = 25):
+    graph = BeliefGraph()
+    hub = graph.add_node(BeliefNode("hub", "core", 0.5))
+    ids = []
+    for i in range(spokes):
+        node_id = graph.add_node(BeliefNode(f"n{i}", "t", 0.5))
+        graph.add_edge(hub, node_id, "supports" if i % 2 else "contradicts", i / spokes)
+        ids.append(node_id)
+    graph.add_edge(ids[0], hub, "supports", 0.9)
+    return graph, hub, ids
+
+
+def _page_through(graph, hub, **filters):
+    seen, cursor = [], None
+    while True:
+        page = graph.get_neighbor_page(hub, False, limit=4, cursor=cursor, **filters)
+        seen.extend(n["id"] for n in page["neighbors"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_filters():
+    graph, hub, ids = _hub()
+    supports = graph.get_neighbors(hub, False, label="supports", direction="out")
+    assert [n["id"] for n in supports] == ids[1::2]
+    assert [n["id"] for n in graph.get_neighbors(hub, False, direction="in")] == [ids[0]]
+    assert all(n["id"] in ids[20:] for n in graph.get_neighbors(hub, False, direction="out", min_confidence=0.8))
+
+
+def test_paging_covers_every_edge_once():
+    graph, hub, ids = _hub()
+    assert sorted(_page_through(graph, hub, direction="out")) == sorted(ids)
+    assert _page_through(graph, hub, label="supports", direction="out") == ids[1::2]
+
+
+def test_cursor_is_stable_under_inserts_and_removals():
+    graph, hub, ids = _hub()
+    first = graph.get_neighbor_page(hub, False, direction="out", label="supports", limit=3)
+    late = graph.add_node(BeliefNode("late", "t", 0.5))
+    graph.add_edge(hub, late, "supports", 0.5)
+    graph.remove_edge(hub, ids[1], "supports")
+
+    rest = graph.get_neighbor_page(hub, False, direction="out", label="supports", cursor=first["next_cursor"])
+    returned = [n["id"] for n in first["neighbors"]] + [n["id"] for n in rest["neighbors"]]
+    assert returned == ids[1::2] + [late]
+
+
+def test_tool_returns_json_dicts():
+    node_id = tools.add_node("a", "t", 0.5)
+    other = tools.add_node("b", "t", 0.5)
+    tools.add_edge(node_id, other, "supports", 0.5)
+    result = tools.call_tool("getNeighbors", {"node_id": node_id})
+    assert result["status"] == "ok"
+    assert json.loads(json.dumps(result["result"]))["neighbors"][0]["id"] == other
@@ -0,0 +1,78 @@
+import multiprocessing
+
+import pytest
+
+import main
+from api.shared_graph import shared_graph
+from graph.graph import BeliefGraph
+from graph.node import BeliefNode
+
+
+def _sample_graph() -> BeliefGraph:
+    graph = BeliefGraph()
+    a = graph.add_node(BeliefNode(label="Pain teaches resilience.", belief_type="belief", confidence=0.7))
+    b = graph.add_node(BeliefNode(label="Rest matters.", belief_type="value", confidence=0.4))
+    graph.add_edge(a, b, "supports", confidence=0.6)
+    return graph
+
+
+def test_save_load_round_trip(tmp_path):
+    graph = _sample_graph()
+    path = tmp_path / "graph.json"
+    graph.save_to_file(str(path))
+
+    loaded = BeliefGraph()
+    loaded.load_from_file(str(path))
+
+    assert loaded.get_nodes() == graph.get_nodes()
+    assert loaded.get_edges() == graph.get_edges()
+    assert loaded.node_counter == graph.node_counter
+    assert loaded.get_edges_by_label("supports") == graph.get_edges_by_label("supports")
+
+
+def test_json_round_trip():
+    graph = _sample_graph()
+    copy = BeliefGraph()
+    copy.from_json(graph.to_json())
+    copy.validate_graph()
+    assert copy.get_nodes() == graph.get_nodes()
+    assert copy.get_edges() == graph.get_edges()
+
+
+@pytest.fixture
+def restore_shared_graph():
+    saved = (shared_graph.graph, shared_graph.node_counter)
+    yield
+    shared_graph.graph, shared_graph.node_counter = saved
+
+
+def test_forked_children_see_prewarmed_state(tmp_path, monkeypatch, restore_shared_graph):
+    path = tmp_path / "graph.json"
+    _sample_graph().save_to_file(str(path))
+    # The OpenAI client is not under test here; everything else prewarm
+    # resolves is.
+    monkeypatch.setattr(main, "get_client", lambda: None)
+    monkeypatch.setattr(main, "_function_schemas", None)
+
+    results = multiprocessing.get_context("fork").Queue()
+
+    def handler(request):
+        results.put((
+            request,
+            sorted(node["id"] for node in shared_graph.get_nodes()),
+            main._function_schemas is not None and len(main._function_schemas),
+        ))
+
+    main.serve_prefork(handler, 2, ["a", "b", "c"], graph_path=str(path))
+
+    seen = sorted(results.get(timeout=10) for _ in range(3))
+    assert [request for request, _, _ in seen] == ["a", "b", "c"]
+    for _, node_ids, schema_count in seen:
+        assert node_ids == ["belief_0", "belief_1"]
+        assert schema_count == len(main.tools.tool_schemas)
+
+
+def test_prewarm_reports_unloadable_graph(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "get_client", lambda: None)
+    with pytest.raises(ValueError):
+        main.prewarm(str(tmp_path / "missing.json"))
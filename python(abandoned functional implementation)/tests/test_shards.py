@@ -0,0 +1,116 @@
+import os
+import random
+import time
+
+import pytest
+
+from graph import shards
+from graph.graph import BeliefGraph
+from graph.node import BeliefNode
+
+LABELS = ("Pain teaches", "pain  TEACHES", "Joy matters", "Hope")
+
+
+def build(size: int, seed: int = 7) -> BeliefGraph:
+    rng = random.Random(seed)
+    graph = BeliefGraph()
+    ids = [graph.add_node(BeliefNode(f"{rng.choice(LABELS)} {i % (size // 4 or 1)}", "t", rng.random())) for i in range(size)]
+    for i in range(1, size):
+        graph.add_edge(ids[rng.randrange(i)], ids[i], rng.choice(("supports", "contradicts")), rng.random())
+    return graph
+
+
+def serial_support(graph: BeliefGraph):
+    scores = {node["id"]: node["confidence"] for node in graph.get_nodes()}
+    for edge in graph.get_edges():
+        scores[edge["target"]] += edge["confidence"] * graph.get_node(edge["source"]).confidence
+    return scores
+
+
+@pytest.mark.parametrize("by", ["hash", "community"])
+def test_partition_covers_graph(by):
+    graph = build(200)
+    parts = graph.partition(4, by)
+    assert sum(len(part) for part in parts.nodes) == 200
+    assert sum(len(parts.owned_edges(s)) for s in range(4)) == 199
+    assert all(parts.shard_of(e["source"]) != parts.shard_of(e["target"]) for e in parts.cross_edges)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_jobs_match_serial(workers):
+    graph = build(300)
+    parts = graph.partition(3)
+
+    expected = serial_support(graph)
+    ranked = shards.rank_support(parts, workers)
+    assert len(ranked) == 300
+    assert all(score == pytest.approx(expected[node_id]) for node_id, score in ranked)
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+
+    by_label = {}
+    for node in graph.get_nodes():
+        by_label.setdefault(" ".join(node["label"].lower().split()), []).append(node["id"])
+    expected_groups = sorted(sorted(ids) for ids in by_label.values() if len(ids) > 1)
+    assert expected_groups and shards.find_duplicates(parts, workers) == expected_groups
+
+    graph.validate_graph(workers=workers)
+
+
+@pytest.mark.parametrize("attrs", [
+    {"label": "no id", "type": "t", "confidence": 0.5},
+    {"id": "bad_0", "label": "no type", "confidence": 0.5},
+])
+def test_parallel_validation_matches_serial(attrs):
+    graph = build(20)
+    graph.graph.add_node("bad_0", **attrs)
+
+    with pytest.raises(ValueError) as serial:
+        graph.validate_graph()
+    with pytest.raises(ValueError) as parallel:
+        graph.validate_graph(workers=2)
+    assert str(parallel.value) == str(serial.value)
+
+
+def test_fan_out_does_not_hold_the_graph_lock(monkeypatch):
+    graph = build(50)
+    seen = []
+
+    def fake_run(workers, fn, calls):
+        # A writer must be able to get in while the jobs run.
+        graph.add_node(BeliefNode("written during fan-out", "t", 0.5))
+        seen.append(len(calls))
+        return [fn(*args) for args in calls]
+
+    monkeypatch.setattr(shards, "_run", fake_run)
+    graph.validate_graph(workers=2)
+    shards.find_duplicates(graph.partition(2), workers=2)
+    assert seen == [2, 2]
+
+
+def benchmark(size: int = 20_000, repeats: int = 3):
+    graph = build(size)
+    jobs = {
+        "validate": lambda w: graph.validate_graph(workers=w),
+        "rank_support": lambda w: shards.rank_support(graph.partition(max(w, 1)), w),
+        "find_duplicates": lambda w: shards.find_duplicates(graph.partition(max(w, 1)), w),
+    }
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores})
+    print(f"{size} nodes, {cores} cores available")
+    for name, job in jobs.items():
+        baseline = None
+        for workers in counts:
+            elapsed = min(_time(job, workers) for _ in range(repeats))
+            baseline = baseline or elapsed
+            print(f"  {name:16s} workers={workers:<2d} {elapsed:7.3f}s  speedup x{baseline / elapsed:.2f}")
+
+
+def _time(job, workers):
+    start = time.perf_counter()
+    job(workers)
+    return time.perf_counter() - start
+
+
+# python -m tests.test_shards
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,67 @@
+import timeit
+
+from api import tools
+
+ADD_EDGE_ARGS = {"from_node_id": "belief_0", "to_node_id": "belief_1", "label": "supports", "confidence": "0.5"}
+
+
+def _validate(name, args):
+    return tools.tool_validators[name](args)
+
+
+def test_coerces_common_mistakes():
+    args = _validate("addNode", {"label": 3, "belief_type": "value", "confidence": "0.7"})
+    assert args == {"label": "3", "belief_type": "value", "confidence": 0.7}
+    flag = tools.compile_schema({"type": "object", "properties": {"flag": {"type": "boolean"}}})
+    assert flag({"flag": "false"}) == {"flag": False}
+
+
+def test_percent_confidence_is_scaled():
+    assert _validate("addNode", {"label": "a", "belief_type": "b", "confidence": 85})["confidence"] == 0.85
+    assert _validate("addNode", {"label": "a", "belief_type": "b", "confidence": "85%"})["confidence"] == 0.85
+    assert _validate("addNode", {"label": "a", "belief_type": "b", "confidence": 1})["confidence"] == 1.0
+    assert _validate("addNode", {"label": "a", "belief_type": "b", "confidence": "0.5%"})["confidence"] == 0.005
+
+
+def test_out_of_range_is_rejected():
+    for bad in (-0.2, 1.2, 1.5, "1.5", 150, "250%"):
+        result = tools.call_tool("addNode", {"label": "a", "belief_type": "b", "confidence": bad})
+        assert result["status"] == "error" and "confidence" in result["errors"][0]
+
+
+def test_out_of_range_integer_is_rejected():
+    for bad in (0, 10000):
+        result = tools.call_tool("getNeighbors", {"node_id": "belief_0", "limit": bad})
+        assert result["status"] == "error" and "limit" in result["errors"][0]
+
+
+def test_null_required_argument_is_one_error():
+    result = tools.call_tool("addNode", {"label": None, "belief_type": "b", "confidence": 0.5})
+    assert result["errors"] == ["Missing required argument 'label'"]
+
+
+def test_reports_every_error():
+    result = tools.call_tool("addNode", '{"label": "a", "confidence": "high", "bogus": 1}')
+    assert result["status"] == "error"
+    assert len(result["errors"]) == 3
+
+
+def test_call_tool_never_raises():
+    assert tools.call_tool("nope", {})["status"] == "error"
+    assert tools.call_tool("addNode", "{not json")["status"] == "error"
+    assert tools.call_tool("getNode", {"node_id": "missing"})["status"] == "error"
+
+    node_id = tools.call_tool("addNode", {"label": "a", "belief_type": "b", "confidence": 0.5})["result"]
+    result = tools.call_tool("addHistory", {"node_id": node_id, "action": "Reinforced"})
+    assert result["status"] == "ok"
+
+
+def bench_validation(number: int = 100_000) -> float:
+    """Microseconds per addEdge validation."""
+    validate = tools.tool_validators["addEdge"]
+    return timeit.timeit(lambda: validate(ADD_EDGE_ARGS), number=number) / number * 1e6
+
+
+# python -m tests.test_tool_validation
+if __name__ == "__main__":
+    print(f"addEdge validation: {bench_validation():.2f} us/call")